@@ -0,0 +1,26 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Бот при импорте читает и создает data/ в текущей папке,
+# поэтому тесты работают во временной папке с пустыми данными
+ROOT = Path(__file__).resolve().parent.parent
+WORK_DIR = tempfile.mkdtemp(prefix="prorok_tests_")
+os.chdir(WORK_DIR)
+os.environ["STORAGE_BACKEND"] = "json"
+sys.path.insert(0, str(ROOT))
+
+import bot_tg_prorok as bot_module  # noqa: E402
+
+
+@pytest.fixture
+def bot_tg():
+    """Модуль бота с пустыми слотами и записями"""
+    bot_module.clear_slots()
+    bot_module.clear_bookings()
+    yield bot_module
+    bot_module.clear_slots()
+    bot_module.clear_bookings()
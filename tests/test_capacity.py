@@ -0,0 +1,87 @@
+"""Слот не переполняется, даже если тысячи пользователей нажимают одновременно"""
+import asyncio
+from datetime import datetime
+
+SLOT_DATE = "01.03.2030"
+SLOT_TIME = "10:00"
+FIRST_USER_ID = 10 ** 9
+
+
+class FakeUser:
+    def __init__(self, user_id):
+        self.id = user_id
+        self.username = ""
+        self.full_name = "Test"
+
+
+class FakeMessage:
+    def __init__(self, user_id):
+        self.from_user = FakeUser(user_id)
+        self.texts = []
+
+    async def edit_text(self, text, reply_markup=None, **kwargs):
+        self.texts.append(text)
+
+    async def answer(self, text, reply_markup=None, **kwargs):
+        self.texts.append(text)
+
+
+class FakeCallback:
+    def __init__(self, user_id, data):
+        self.from_user = FakeUser(user_id)
+        self.data = data
+        self.message = FakeMessage(user_id)
+        self.alerts = []
+
+    async def answer(self, text=None, show_alert=False, **kwargs):
+        self.alerts.append(text)
+
+
+def register_users(bot_tg, count):
+    for user_id in range(FIRST_USER_ID, FIRST_USER_ID + count):
+        bot_tg.users[str(user_id)] = bot_tg.User(user_id, "Test", str(user_id))
+
+
+def remove_users(bot_tg, count):
+    for user_id in range(FIRST_USER_ID, FIRST_USER_ID + count):
+        bot_tg.users.pop(str(user_id), None)
+
+
+def test_concurrent_reservations_fill_slot_exactly(bot_tg):
+    bot_tg.add_slot(bot_tg.Slot(SLOT_DATE, SLOT_TIME))
+
+    async def reserve(user_id):
+        # Уступаем цикл событий, чтобы проверки мест перемежались
+        await asyncio.sleep(0)
+        return bot_tg.reserve_booking(bot_tg.Booking(user_id, SLOT_DATE, SLOT_TIME, datetime.now()))
+
+    async def run():
+        return await asyncio.gather(*(reserve(FIRST_USER_ID + i) for i in range(3000)))
+
+    results = asyncio.run(run())
+    assert results.count(bot_tg.BOOKING_OK) == bot_tg.MAX_BOOKINGS_PER_SLOT
+    assert results.count(bot_tg.BOOKING_FULL) == 3000 - bot_tg.MAX_BOOKINGS_PER_SLOT
+    assert bot_tg.get_slot_booked_count(SLOT_DATE, SLOT_TIME) == bot_tg.MAX_BOOKINGS_PER_SLOT
+
+
+def test_concurrent_callbacks_never_overbook(bot_tg):
+    users_count = 3000
+    register_users(bot_tg, users_count)
+    slot = bot_tg.Slot(SLOT_DATE, SLOT_TIME)
+    bot_tg.add_slot(slot)
+    callbacks = [FakeCallback(FIRST_USER_ID + i, f"select_time_{slot.slot_id}") for i in range(users_count)]
+    # Каждый пользователь жмет кнопку дважды
+    callbacks += [FakeCallback(FIRST_USER_ID + i, f"select_time_{slot.slot_id}") for i in range(users_count)]
+
+    async def run():
+        await asyncio.gather(*(bot_tg.select_time_slot(callback) for callback in callbacks))
+
+    try:
+        asyncio.run(run())
+        confirmed = [c for c in callbacks if c.message.texts and c.message.texts[0].startswith("✅")]
+        assert len(confirmed) == bot_tg.MAX_BOOKINGS_PER_SLOT
+        assert len({c.from_user.id for c in confirmed}) == bot_tg.MAX_BOOKINGS_PER_SLOT
+        assert bot_tg.get_slot_booked_count(SLOT_DATE, SLOT_TIME) == bot_tg.MAX_BOOKINGS_PER_SLOT
+        assert len(bot_tg.user_time_selections) == bot_tg.MAX_BOOKINGS_PER_SLOT
+    finally:
+        remove_users(bot_tg, users_count)
@@ -0,0 +1,171 @@
+"""Писатель кластера решает, применять ли изменение, и пишет только примененные"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from test_capacity import FakeCallback, FakeMessage
+
+
+def journaled(bot_tg, op):
+    return [entry for entry in bot_tg.persistence._pending_entries if entry["op"] == op]
+
+
+async def start_writer(bot_tg, path):
+    return await asyncio.start_unix_server(bot_tg.handle_worker_connection, path=str(path),
+                                           limit=bot_tg.CLUSTER_LINE_LIMIT)
+
+
+def test_concurrent_slot_add_applied_once(bot_tg, tmp_path, monkeypatch):
+    monkeypatch.setattr(bot_tg.persistence, "_pending_entries", [])
+    path = tmp_path / "writer.sock"
+    # Два создателя одновременно добавляют одно и то же время
+    first = bot_tg.Slot("05.03.2030", "10:00", "A", datetime(2030, 1, 1, 10), 1)
+    second = bot_tg.Slot("05.03.2030", "10:00", "B", datetime(2030, 1, 1, 11), 2)
+
+    async def scenario():
+        server = await start_writer(bot_tg, path)
+        link = bot_tg.WriterLink(path)
+        try:
+            await link.connect()
+            added = await asyncio.gather(link.apply("slot_add", first.to_dict()),
+                                         link.apply("slot_add", second.to_dict()))
+            removed = await link.apply("creator_remove", {"user_id": 123456789})
+            return added, removed
+        finally:
+            await link.close()
+            server.close()
+            await server.wait_closed()
+
+    added, removed = asyncio.run(scenario())
+    assert added == [True, False]
+    assert removed is False
+    assert bot_tg.get_slot("05.03.2030", "10:00").slot_id == first.slot_id
+    assert len(journaled(bot_tg, "slot_add")) == 1
+    assert not journaled(bot_tg, "creator_remove")
+
+
+def test_booking_reports_unreachable_writer(bot_tg, monkeypatch):
+    bot_tg.add_slot(bot_tg.Slot("05.03.2030", "10:00"))
+    slot = bot_tg.get_slot("05.03.2030", "10:00")
+    bot_tg.users["777002"] = bot_tg.User(777002, "Test", "777002")
+
+    async def unreachable(record):
+        raise ConnectionError("Соединение с писателем потеряно")
+
+    monkeypatch.setattr(bot_tg, "book_slot", unreachable)
+    callback = FakeCallback(777002, f"select_time_{slot.slot_id}")
+    try:
+        asyncio.run(bot_tg.select_time_slot(callback))
+    finally:
+        bot_tg.users.pop("777002", None)
+    assert callback.alerts == [bot_tg.WRITER_UNAVAILABLE_TEXT]
+    assert bot_tg.get_slot_booked_count("05.03.2030", "10:00") == 0
+
+
+class FakeState:
+    def __init__(self, data):
+        self.data = data
+        self.cleared = False
+
+    async def get_data(self):
+        return dict(self.data)
+
+    async def clear(self):
+        self.cleared = True
+
+
+def registration_message(user_id):
+    message = FakeMessage(user_id)
+    message.text = "Петров"
+    return message
+
+
+def test_registration_goes_through_writer(bot_tg, tmp_path, monkeypatch):
+    monkeypatch.setattr(bot_tg.persistence, "_pending_entries", [])
+    monkeypatch.setattr(bot_tg, "BOT_ROLE", "worker")
+    path = tmp_path / "writer.sock"
+    message = registration_message(777004)
+    state = FakeState({"first_name": "Иван"})
+
+    async def scenario():
+        server = await start_writer(bot_tg, path)
+        link = bot_tg.WriterLink(path)
+        monkeypatch.setattr(bot_tg, "writer_link", link)
+        try:
+            await link.connect()
+            await bot_tg.process_last_name(message, state)
+        finally:
+            await link.close()
+            server.close()
+            await server.wait_closed()
+
+    try:
+        asyncio.run(scenario())
+        assert bot_tg.users["777004"].full_name == "Иван Петров"
+        assert [entry["data"]["user_id"] for entry in journaled(bot_tg, "user_set")] == ["777004"]
+        assert state.cleared
+    finally:
+        bot_tg.users.pop("777004", None)
+
+
+def test_registration_kept_when_writer_unreachable(bot_tg, monkeypatch):
+    monkeypatch.setattr(bot_tg, "BOT_ROLE", "worker")
+
+    async def unreachable(op, payload):
+        raise ConnectionError("Соединение с писателем потеряно")
+
+    monkeypatch.setattr(bot_tg.writer_link, "apply", unreachable)
+    message = registration_message(777005)
+    state = FakeState({"first_name": "Иван"})
+    asyncio.run(bot_tg.process_last_name(message, state))
+
+    # Пользователь не добавлен, а диалог ждет фамилию еще раз
+    assert "777005" not in bot_tg.users
+    assert not state.cleared
+    assert message.texts == [bot_tg.WRITER_UNAVAILABLE_TEXT]
+
+
+
+@pytest.mark.parametrize("role, expected", [
+    ("writer", "None None"),
+    ("worker", "SqliteFsmStorage None"),
+])
+def test_role_opens_only_its_storages(bot_tg, tmp_path, role, expected):
+    # Роль читается при импорте, поэтому модуль загружается в отдельном процессе
+    code = ("import bot_tg_prorok as bot; "
+            "print(type(bot.fsm_storage).__name__ if bot.fsm_storage else None, bot.updates)")
+    env = {**os.environ, "BOT_MODE": "cluster", "BOT_ROLE": role,
+           "PYTHONPATH": str(Path(bot_tg.__file__).parent)}
+    result = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.stdout.splitlines()[-1] == expected
+    assert (tmp_path / "data" / "fsm_prorok.db").exists() == (role == "worker")
+
+
+def test_snapshot_sent_in_parts(bot_tg, monkeypatch):
+    monkeypatch.setattr(bot_tg, "CLUSTER_SNAPSHOT_CHUNK", 2)
+    for time_str in ("10:00", "11:00", "12:00"):
+        bot_tg.add_slot(bot_tg.Slot("05.03.2030", time_str))
+    snapshot = bot_tg.state_snapshot()
+    parts = [{"type": "snapshot_part", "name": name, "items": items}
+             for name, items in bot_tg.snapshot_parts(snapshot)]
+    assert [len(part["items"]) for part in parts if part["name"] == "time_slots"] == [2, 1]
+
+    # Операция, разосланная писателем, пока уходил снимок, применяется после него
+    late = bot_tg.Slot("05.03.2030", "13:00")
+    messages = [{"type": "snapshot_start"}, parts[0],
+                {"type": "op", "op": "slot_add", "data": late.to_dict()},
+                *parts[1:], {"type": "snapshot_end"}]
+    bot_tg.clear_slots()
+    link = bot_tg.WriterLink(None)
+    for message in messages:
+        link._handle(json.loads(bot_tg.encode_message(message)))
+
+    assert link._connected.is_set()
+    assert [slot.time_str for slot in bot_tg.available_datetimes] == ["10:00", "11:00", "12:00", "13:00"]
@@ -0,0 +1,39 @@
+"""Индексы дат пересобираются только при изменении состава расписания"""
+from datetime import datetime
+
+
+def book(bot_tg, user_id, date_str, time_str):
+    return bot_tg.reserve_booking(bot_tg.Booking(user_id, date_str, time_str, datetime.now()))
+
+
+def test_booking_on_booked_slot_keeps_indexes(bot_tg):
+    for day in range(1, 21):
+        bot_tg.add_slot(bot_tg.Slot(f"{day:02d}.03.2030", "10:00"))
+    book(bot_tg, 1, "01.03.2030", "10:00")
+    slot_dates = bot_tg.get_slot_dates_index()
+    booked_dates = bot_tg.get_booked_dates_index()
+    booked_slots = bot_tg.get_booked_slots_index()
+
+    # Еще одна запись на тот же слот - состав не изменился
+    book(bot_tg, 2, "01.03.2030", "10:00")
+    assert bot_tg.get_slot_dates_index() is slot_dates
+    assert bot_tg.get_booked_dates_index() is booked_dates
+    assert bot_tg.get_booked_slots_index() is booked_slots
+
+
+def test_indexes_follow_layout_changes(bot_tg):
+    bot_tg.add_slot(bot_tg.Slot("02.03.2030", "10:00"))
+    assert [d for _, d in bot_tg.get_slot_dates_index()] == ["02.03.2030"]
+    assert bot_tg.get_booked_dates_index() == []
+
+    # Первая запись на слот и новый слот попадают в индексы
+    book(bot_tg, 1, "02.03.2030", "10:00")
+    bot_tg.add_slot(bot_tg.Slot("01.03.2030", "10:00"))
+    assert [d for _, d in bot_tg.get_slot_dates_index()] == ["01.03.2030", "02.03.2030"]
+    assert [d for _, d in bot_tg.get_booked_dates_index()] == ["02.03.2030"]
+
+    # Удаление слота вместе с записями убирает дату из обоих индексов
+    bot_tg.remove_slot(bot_tg.get_slot("02.03.2030", "10:00"))
+    bot_tg.remove_slot_bookings("02.03.2030", "10:00")
+    assert [d for _, d in bot_tg.get_slot_dates_index()] == ["01.03.2030"]
+    assert bot_tg.get_booked_slots_index() == []
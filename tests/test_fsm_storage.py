@@ -0,0 +1,70 @@
+"""Состояния диалогов в SQLite переживают перезапуск и истекают по сроку"""
+import asyncio
+import sqlite3
+import time
+
+from aiogram.fsm.storage.base import StorageKey
+
+KEY = StorageKey(bot_id=1, chat_id=42, user_id=42)
+
+
+def test_state_and_data_survive_reopen(bot_tg, tmp_path):
+    path = tmp_path / "fsm.db"
+
+    async def first_run():
+        storage = bot_tg.SqliteFsmStorage(path)
+        await storage.set_state(KEY, bot_tg.RegistrationState.waiting_for_last_name)
+        await storage.set_data(KEY, {"first_name": "Анна"})
+        await storage.close()
+
+    async def second_run():
+        storage = bot_tg.SqliteFsmStorage(path)
+        try:
+            return await storage.get_state(KEY), await storage.get_data(KEY)
+        finally:
+            await storage.close()
+
+    asyncio.run(first_run())
+    state, data = asyncio.run(second_run())
+    assert state == bot_tg.RegistrationState.waiting_for_last_name.state
+    assert data == {"first_name": "Анна"}
+
+
+def test_expired_dialog_loads_empty(bot_tg, tmp_path):
+    path = tmp_path / "fsm.db"
+
+    async def write():
+        storage = bot_tg.SqliteFsmStorage(path)
+        await storage.set_state(KEY, "some:state")
+        await storage.set_data(KEY, {"step": 1})
+        await storage.close()
+
+    asyncio.run(write())
+    # Диалог брошен два часа назад при сроке жизни в час
+    with sqlite3.connect(str(path)) as conn:
+        conn.execute("UPDATE fsm SET updated_at = ?", (time.time() - 7200,))
+
+    async def read():
+        storage = bot_tg.SqliteFsmStorage(path, ttl=3600)
+        try:
+            return await storage.get_state(KEY), await storage.get_data(KEY)
+        finally:
+            await storage.close()
+
+    assert asyncio.run(read()) == (None, {})
+
+
+def test_flush_after_set_data_persists(bot_tg, tmp_path):
+    path = tmp_path / "fsm.db"
+
+    async def run():
+        storage = bot_tg.SqliteFsmStorage(path, flush_delay=60)
+        try:
+            await storage.set_data(KEY, {"date": "01.05.2030"})
+            await storage.flush()
+            with sqlite3.connect(str(path)) as conn:
+                return conn.execute("SELECT data FROM fsm").fetchall()
+        finally:
+            await storage.close()
+
+    assert asyncio.run(run()) == [('{"date": "01.05.2030"}',)]
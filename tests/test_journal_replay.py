@@ -0,0 +1,39 @@
+"""Журнал, примененный поверх уже записанных снимков, не теряет изменений"""
+import json
+from datetime import datetime
+
+SLOT = ("10.03.2030", "12:00")
+
+
+def slot_entry(created_at):
+    return {"op": "slot_add", "data": {"date_str": SLOT[0], "time_str": SLOT[1],
+                                       "created_at": created_at}}
+
+
+def booking_entry(user_id, selected_at):
+    return {"op": "booking_add", "data": {"user_id": user_id, "date_str": SLOT[0],
+                                          "time_str": SLOT[1], "selected_at": selected_at}}
+
+
+def test_readded_slot_survives_replay_over_snapshot(bot_tg, tmp_path, monkeypatch):
+    journal = tmp_path / "journal.jsonl"
+    entries = [
+        slot_entry("2030-03-01T10:00:00"),
+        booking_entry(1, "2030-03-01T11:00:00"),
+        {"op": "slot_delete", "data": {"date_str": SLOT[0], "time_str": SLOT[1]}},
+        slot_entry("2030-03-02T10:00:00"),
+        booking_entry(2, "2030-03-02T11:00:00"),
+    ]
+    journal.write_text("".join(json.dumps(entry) + "\n" for entry in entries), encoding="utf-8")
+    monkeypatch.setattr(bot_tg, "JOURNAL_FILE", journal)
+
+    # Снимки уже записаны, а журнал не успели очистить
+    data = {"users": {}, "creators": [],
+            "time_slots": [{"date_str": SLOT[0], "time_str": SLOT[1],
+                            "created_at": datetime(2030, 3, 2, 10)}],
+            "bookings": [{"user_id": 2, "date_str": SLOT[0], "time_str": SLOT[1],
+                          "selected_at": datetime(2030, 3, 2, 11)}]}
+    assert bot_tg.replay_journal(data) == len(entries)
+
+    assert [slot["created_at"] for slot in data["time_slots"]] == [datetime(2030, 3, 2, 10)]
+    assert [booking["user_id"] for booking in data["bookings"]] == [2]
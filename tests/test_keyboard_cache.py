@@ -0,0 +1,17 @@
+"""Кэш клавиатур ограничен по размеру и вытесняет давно не открытые"""
+
+
+def test_cache_evicts_least_recently_used(bot_tg, monkeypatch):
+    monkeypatch.setattr(bot_tg, "KEYBOARD_CACHE_SIZE", 3)
+    bot_tg.keyboard_cache.clear()
+    dates = [f"{day:02d}.04.2030" for day in range(1, 6)]
+    for date_str in dates[:3]:
+        bot_tg.get_available_times_keyboard(date_str)
+    # Первая дата открыта снова и поэтому переживает вытеснение
+    first = bot_tg.get_available_times_keyboard(dates[0])
+    for date_str in dates[3:]:
+        bot_tg.get_available_times_keyboard(date_str)
+
+    cached_dates = [args[0] for _, args in bot_tg.keyboard_cache]
+    assert cached_dates == [dates[0], dates[3], dates[4]]
+    assert bot_tg.get_available_times_keyboard(dates[0]) is first
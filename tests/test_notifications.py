@@ -0,0 +1,107 @@
+"""Фоновая отправка уведомлений через подмененную сессию бота"""
+import asyncio
+import time
+
+import pytest
+from aiogram.methods import SendMessage
+
+
+@pytest.fixture
+def sent_messages(bot_tg, monkeypatch):
+    """Сообщения, "отправленные" в Telegram: (время, чат, текст)"""
+    sent = []
+
+    async def fake_make_request(bot, method, timeout=None):
+        await asyncio.sleep(0.005)
+        if isinstance(method, SendMessage):
+            sent.append((time.monotonic(), method.chat_id, method.text))
+        return True
+
+    monkeypatch.setattr(bot_tg.bot.session, "make_request", fake_make_request)
+    return sent
+
+
+def make_dispatcher(bot_tg, global_rate=1000, chat_rate=1000):
+    return bot_tg.NotificationDispatcher(concurrency=4, global_rate=global_rate, chat_rate=chat_rate,
+                                         queue_size=1000, max_retries=3)
+
+
+def test_global_rate_is_capped(bot_tg, sent_messages):
+    rate = 50
+    dispatcher = make_dispatcher(bot_tg, global_rate=rate)
+
+    async def run():
+        dispatcher.start()
+        started = time.monotonic()
+        for chat_id in range(80):
+            dispatcher.enqueue(chat_id, f"message {chat_id}")
+        await dispatcher.stop()
+        return started
+
+    started = asyncio.run(run())
+    assert dispatcher.sent == 80
+    # Первые rate сообщений уходят сразу, дальше не чаще rate в секунду
+    for index, (sent_at, _, _) in enumerate(sent_messages):
+        assert sent_at - started >= (index + 1 - rate) / rate - 0.02
+
+
+def test_chat_rate_keeps_order(bot_tg, sent_messages):
+    rate = 10
+    dispatcher = make_dispatcher(bot_tg, chat_rate=rate)
+
+    async def run():
+        dispatcher.start()
+        started = time.monotonic()
+        for number in range(15):
+            dispatcher.enqueue(1, f"message {number}")
+        await dispatcher.stop()
+        return started
+
+    started = asyncio.run(run())
+    assert [text for _, _, text in sent_messages] == [f"message {number}" for number in range(15)]
+    for index, (sent_at, _, _) in enumerate(sent_messages):
+        assert sent_at - started >= (index + 1 - rate) / rate - 0.02
+
+
+def test_queued_messages_delivered_on_stop(bot_tg, sent_messages):
+    dispatcher = make_dispatcher(bot_tg)
+
+    async def run():
+        dispatcher.start()
+        for chat_id in range(30):
+            dispatcher.enqueue(chat_id, "bye")
+        # Остановка сразу после постановки в очередь дожидается отправки
+        await dispatcher.stop()
+
+    asyncio.run(run())
+    assert dispatcher.pending == 0
+    assert sorted(chat_id for _, chat_id, _ in sent_messages) == list(range(30))
+
+
+class RecordingNotifier:
+    def __init__(self):
+        self.messages = []
+
+    def enqueue(self, chat_id, text, **kwargs):
+        self.messages.append((chat_id, text))
+        return True
+
+
+def test_digest_combines_bookings_per_creator(bot_tg, monkeypatch):
+    notifier = RecordingNotifier()
+    monkeypatch.setattr(bot_tg, "notifier", notifier)
+    monkeypatch.setattr(bot_tg, "creators", [1, 2])
+    digest = bot_tg.NotificationDigest(0.05)
+
+    async def run():
+        # Создатель 1 тоже записался - о своей записи он не узнает
+        for user_id in (11, 12, 13, 1):
+            digest.add_booking(bot_tg.Booking(user_id, "05.03.2030", "18:00"))
+        assert notifier.messages == []
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+    assert sorted(chat_id for chat_id, _ in notifier.messages) == [1, 2]
+    texts = dict(notifier.messages)
+    assert "НОВЫЕ ЗАПИСИ: 3" in texts[1]
+    assert "НОВЫЕ ЗАПИСИ: 4" in texts[2]
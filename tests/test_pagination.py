@@ -0,0 +1,45 @@
+"""Листание назад попадает на начало настоящей предыдущей страницы"""
+
+
+def page_starts(bot_tg, items, render_item):
+    """Начала страниц при листании вперед до конца"""
+    starts, offset = [0], 0
+    while True:
+        _, _, next_offset = bot_tg.paginate(items, offset, render_item, "header\n", "footer")
+        if next_offset >= len(items):
+            return starts
+        starts.append(next_offset)
+        offset = next_offset
+
+
+def test_previous_page_follows_short_pages(bot_tg):
+    # Элементы разной длины: часть страниц обрезается лимитом сообщения
+    items = [("x" * (1500 if i % 3 == 0 else 40)) for i in range(40)]
+    render_item = lambda i, item: f"{i}. {item}\n"
+    starts = page_starts(bot_tg, items, render_item)
+    assert any(b - a < bot_tg.PAGE_SIZE for a, b in zip(starts, starts[1:]))
+
+    for previous, current in zip(starts, starts[1:]):
+        _, prev_offset, _ = bot_tg.paginate(items, current, render_item, "header\n", "footer")
+        assert prev_offset == previous
+    _, prev_offset, _ = bot_tg.paginate(items, 0, render_item, "header\n", "footer")
+    assert prev_offset is None
+
+
+def test_users_by_bookings_index_follows_booking_counts(bot_tg):
+    bot_tg.add_slot(bot_tg.Slot("06.04.2030", "10:00"))
+    bot_tg.add_slot(bot_tg.Slot("06.04.2030", "11:00"))
+    bot_tg.reserve_booking(bot_tg.Booking(1, "06.04.2030", "10:00"))
+    bot_tg.reserve_booking(bot_tg.Booking(2, "06.04.2030", "10:00"))
+    bot_tg.reserve_booking(bot_tg.Booking(2, "06.04.2030", "11:00"))
+    version = bot_tg.stats.bookings_version
+    assert bot_tg.stats.users_by_bookings_order() == [2, 1]
+
+    # Новый слот не меняет числа записей
+    bot_tg.add_slot(bot_tg.Slot("07.04.2030", "10:00"))
+    assert bot_tg.stats.bookings_version == version
+
+    bot_tg.reserve_booking(bot_tg.Booking(1, "06.04.2030", "11:00"))
+    bot_tg.reserve_booking(bot_tg.Booking(1, "07.04.2030", "10:00"))
+    assert bot_tg.stats.bookings_version > version
+    assert bot_tg.stats.users_by_bookings_order() == [1, 2]
@@ -0,0 +1,58 @@
+"""Операция, которую хранилище не принимает, не держит запись остальных"""
+import asyncio
+import json
+
+
+class PickyStorage:
+    """Хранилище, которое отклоняет любую пачку с операцией "bad" """
+    needs_snapshots = False
+
+    def __init__(self, reject_all=False):
+        self.reject_all = reject_all
+        self.written = []
+
+    def write_batch(self, entries, snapshots):
+        if self.reject_all or any(entry["op"] == "bad" for entry in entries):
+            raise ValueError("rejected")
+        self.written.extend(entry["op"] for entry in entries)
+        return True
+
+
+def setup_writer(bot_tg, tmp_path, monkeypatch, storage):
+    monkeypatch.setattr(bot_tg, "storage", storage)
+    monkeypatch.setattr(bot_tg, "REJECTED_FILE", tmp_path / "rejected.jsonl")
+    monkeypatch.setattr(bot_tg, "PERSIST_MAX_ATTEMPTS", 2)
+    return bot_tg.PersistenceWriter(0)
+
+
+def rejected_ops(bot_tg):
+    lines = bot_tg.REJECTED_FILE.read_text(encoding="utf-8").splitlines()
+    return [json.loads(line)["op"] for line in lines]
+
+
+def test_failing_entry_is_set_aside(bot_tg, tmp_path, monkeypatch):
+    storage = PickyStorage()
+    writer = setup_writer(bot_tg, tmp_path, monkeypatch, storage)
+    for op in ("first", "bad", "second"):
+        writer.enqueue({"op": op, "data": {}}, ("users",))
+
+    asyncio.run(writer.flush())
+    # Все, что до отклоненной операции, уже записано, остальное ждет
+    assert storage.written == ["first"]
+
+    asyncio.run(writer.flush())
+    assert storage.written == ["first", "second"]
+    assert rejected_ops(bot_tg) == ["bad"]
+
+
+def test_unwritten_entries_are_kept_on_stop(bot_tg, tmp_path, monkeypatch):
+    writer = setup_writer(bot_tg, tmp_path, monkeypatch, PickyStorage(reject_all=True))
+
+    async def run():
+        writer.start()
+        writer.enqueue({"op": "first", "data": {}}, ("users",))
+        writer.enqueue({"op": "second", "data": {}}, ("users",))
+        await writer.stop()
+
+    asyncio.run(run())
+    assert rejected_ops(bot_tg) == ["first", "second"]
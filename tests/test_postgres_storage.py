@@ -0,0 +1,135 @@
+"""Проверка PostgreSQL-хранилища на локальном сервере.
+
+Адрес сервера берется из TEST_DATABASE_URL; если он не задан, тест
+поднимает временный сервер через pgserver. Без обоих тесты пропускаются.
+Для каждого теста создается и затем удаляется отдельная база.
+"""
+import asyncio
+import json
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+import psycopg2.extensions
+import pytest
+
+
+@pytest.fixture(scope="session")
+def server_dsn(tmp_path_factory):
+    dsn = os.getenv("TEST_DATABASE_URL")
+    if dsn:
+        yield dsn
+        return
+    pgserver = pytest.importorskip("pgserver")
+    # pgserver пишет в лог и при выходе из процесса, когда вывод pytest уже закрыт
+    logging.getLogger("pgserver").setLevel(logging.WARNING)
+    server = pgserver.get_server(str(tmp_path_factory.mktemp("pgdata")), cleanup_mode=None)
+    yield server.get_uri()
+    server.cleanup()
+
+
+@pytest.fixture
+def database_dsn(server_dsn):
+    name = f"prorok_test_{uuid.uuid4().hex[:8]}"
+    admin = psycopg2.connect(server_dsn)
+    admin.autocommit = True
+    with admin.cursor() as cursor:
+        cursor.execute(f"CREATE DATABASE {name}")
+    try:
+        yield psycopg2.extensions.make_dsn(server_dsn, dbname=name)
+    finally:
+        with admin.cursor() as cursor:
+            cursor.execute(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)")
+        admin.close()
+
+
+@pytest.fixture
+def json_files(bot_tg, tmp_path, monkeypatch):
+    """Подменить файлы JSON-данных пустыми во временной папке"""
+    for name in ("USERS_FILE", "CREATORS_FILE", "BOOKINGS_FILE", "TIME_SLOTS_FILE", "JOURNAL_FILE"):
+        monkeypatch.setattr(bot_tg, name, tmp_path / getattr(bot_tg, name).name)
+    return bot_tg
+
+
+def booking_entry(bot_tg, user_id, date_str="01.03.2027", time_str="10:00"):
+    return bot_tg.make_journal_entry("booking_add", {
+        "user_id": user_id, "first_name": "A", "last_name": str(user_id), "username": "",
+        "full_name": f"A {user_id}", "date_str": date_str, "time_str": time_str,
+        "selected_at": "2026-10-01T10:00:00", "is_creator": False})
+
+
+def slot_entry(bot_tg, date_str="01.03.2027", time_str="10:00"):
+    return bot_tg.make_journal_entry("slot_add", {
+        "date_str": date_str, "time_str": time_str, "description": "",
+        "created_at": "2026-10-01T10:00:00", "created_by": 1})
+
+
+def test_json_data_imported_with_copy(json_files, database_dsn):
+    bot_tg = json_files
+    users = {str(uid): {"first_name": "A", "last_name": str(uid), "username": "", "full_name": f"A {uid}",
+                        "registered_at": "2026-10-01T10:00:00", "is_creator": False}
+             for uid in range(100, 150)}
+    slots = [{"date_str": "01.03.2027", "time_str": f"{hour}:00", "description": "", 
+              "created_at": "2026-10-01T10:00:00", "created_by": 1} for hour in range(10, 15)]
+    bookings = [booking_entry(bot_tg, uid, time_str="10:00")["data"] for uid in range(100, 105)]
+    bot_tg.USERS_FILE.write_text(json.dumps(users), encoding="utf-8")
+    bot_tg.CREATORS_FILE.write_text(json.dumps([1, 2]), encoding="utf-8")
+    bot_tg.TIME_SLOTS_FILE.write_text(json.dumps(slots), encoding="utf-8")
+    bot_tg.BOOKINGS_FILE.write_text(json.dumps(bookings), encoding="utf-8")
+    
+    storage = bot_tg.PostgresStorage(database_dsn)
+    try:
+        data = storage.load()
+        assert len(data["users"]) == 50
+        assert data["creators"] == [1, 2]
+        assert len(data["time_slots"]) == 5
+        assert len(data["bookings"]) == 5
+        
+        # Повторная загрузка не импортирует JSON второй раз
+        assert len(storage.load()["bookings"]) == 5
+    finally:
+        storage.close()
+
+
+def test_full_slot_rejected_by_database(json_files, database_dsn):
+    bot_tg = json_files
+    storage = bot_tg.PostgresStorage(database_dsn)
+    try:
+        storage.load()
+        storage.write_batch([slot_entry(bot_tg)], None)
+        
+        # Каждая запись - отдельная транзакция из своего потока
+        with ThreadPoolExecutor(max_workers=bot_tg.PG_POOL_MAX) as pool:
+            list(pool.map(lambda uid: storage.write_batch([booking_entry(bot_tg, uid)], None), range(1000, 1030)))
+        
+        bookings = storage.load()["bookings"]
+        assert len(bookings) == bot_tg.MAX_BOOKINGS_PER_SLOT
+    finally:
+        storage.close()
+
+
+def test_booking_confirmed_by_database(json_files, database_dsn, monkeypatch):
+    bot_tg = json_files
+    storage = bot_tg.PostgresStorage(database_dsn)
+    monkeypatch.setattr(bot_tg, "storage", storage)
+    try:
+        storage.load()
+        storage.write_batch([slot_entry(bot_tg)], None)
+        bot_tg.add_slot(bot_tg.Slot.from_dict(slot_entry(bot_tg)["data"]))
+        # Другой экземпляр бота с общей базой занял все места, кроме одного
+        storage.write_batch([booking_entry(bot_tg, uid)
+                             for uid in range(2000, 2000 + bot_tg.MAX_BOOKINGS_PER_SLOT - 1)], None)
+
+        async def book_both():
+            return await asyncio.gather(*(bot_tg.book_slot(bot_tg.Booking(uid, "01.03.2027", "10:00"))
+                                          for uid in (1, 2)))
+
+        results = asyncio.run(book_both())
+        assert sorted(results) == [bot_tg.BOOKING_FULL, bot_tg.BOOKING_OK]
+        # Отказ базы убирает запись из памяти: подтвержден только один
+        assert bot_tg.get_slot_booked_count("01.03.2027", "10:00") == 1
+        assert len(storage.load()["bookings"]) == bot_tg.MAX_BOOKINGS_PER_SLOT
+    finally:
+        storage.close()
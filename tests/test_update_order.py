@@ -0,0 +1,48 @@
+"""Обновления одного пользователя видят состояние FSM, записанное предыдущим"""
+import asyncio
+
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.methods import SendMessage
+from aiogram.types import Update
+
+USER_ID = 777001
+
+
+def text_update(bot_tg, update_id, text):
+    return Update.model_validate({"update_id": update_id, "message": {
+        "message_id": update_id, "date": 0, "text": text,
+        "chat": {"id": USER_ID, "type": "private"},
+        "from": {"id": USER_ID, "is_bot": False, "first_name": "A"}}},
+        context={"bot": bot_tg.bot})
+
+
+def test_quick_answers_register_user(bot_tg, monkeypatch):
+    sent = []
+
+    async def fake_make_request(bot, method, timeout=None):
+        # Ответ Telegram задерживается, чтобы обработчики могли перемешаться
+        await asyncio.sleep(0.01)
+        if isinstance(method, SendMessage):
+            sent.append(method.text)
+        return True
+
+    monkeypatch.setattr(bot_tg.bot.session, "make_request", fake_make_request)
+    key = StorageKey(bot_id=bot_tg.bot.id, chat_id=USER_ID, user_id=USER_ID)
+
+    async def scenario():
+        await bot_tg.fsm_storage.set_state(key, bot_tg.RegistrationState.waiting_for_first_name)
+        # Как при опросе с handle_as_tasks и в режиме вебхука: оба
+        # сообщения обрабатываются параллельными задачами
+        await asyncio.gather(
+            bot_tg.dp.feed_update(bot_tg.bot, text_update(bot_tg, 1, "Иван")),
+            bot_tg.dp.feed_update(bot_tg.bot, text_update(bot_tg, 2, "Петров")),
+        )
+        return await bot_tg.fsm_storage.get_state(key)
+
+    try:
+        assert asyncio.run(scenario()) is None
+        user = bot_tg.users[str(USER_ID)]
+        assert (user.first_name, user.last_name) == ("Иван", "Петров")
+        assert sent[-1].startswith("✅ Регистрация завершена!")
+    finally:
+        bot_tg.users.pop(str(USER_ID), None)
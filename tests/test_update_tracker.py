@@ -0,0 +1,42 @@
+"""Сохраненный номер обновления не отбрасывает новые после недельной паузы"""
+import json
+import time
+
+WEEK = 7 * 24 * 3600
+
+
+def make_tracker(bot_tg, tmp_path, update_id, seen_at):
+    path = tmp_path / "update_offset.json"
+    path.write_text(json.dumps({"update_id": update_id, "seen_at": seen_at}), encoding="utf-8")
+    return bot_tg.UpdateTracker(path)
+
+
+def test_recent_saved_id_skips_handled_updates(bot_tg, tmp_path):
+    tracker = make_tracker(bot_tg, tmp_path, 500, time.time() - 3600)
+    assert tracker.is_handled(500)
+    assert not tracker.is_handled(501)
+
+
+def test_saved_id_older_than_week_is_ignored(bot_tg, tmp_path):
+    tracker = make_tracker(bot_tg, tmp_path, 500, time.time() - WEEK - 60)
+    # Telegram начал нумерацию заново, и новый номер оказался меньше
+    assert not tracker.is_handled(42)
+    tracker.started(42)
+    tracker.finished(42)
+    assert tracker.safe_id == 42
+    assert tracker.needs_save(42)
+
+
+def test_quiet_week_while_running(bot_tg, tmp_path):
+    tracker = make_tracker(bot_tg, tmp_path, 500, time.time())
+    tracker.started(501)
+    tracker.finished(501)
+    tracker.save(501)
+
+    tracker.seen_at -= WEEK + 60
+    assert not tracker.is_handled(7)
+    tracker.started(7)
+    tracker.finished(7)
+    assert tracker.safe_id == 7
+    tracker.save(7)
+    assert bot_tg.UpdateTracker(tracker.path).is_handled(7)
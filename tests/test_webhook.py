@@ -0,0 +1,56 @@
+"""Вебхук проверяет секрет и формат обновления и передает его диспетчеру"""
+import asyncio
+import json
+
+from aiogram.methods import SendMessage
+from aiohttp.test_utils import TestClient, TestServer
+
+SECRET = "test-secret"
+USER_ID = 777002
+UPDATE = {"update_id": 900000001, "message": {
+    "message_id": 1, "date": 0, "text": "привет",
+    "chat": {"id": USER_ID, "type": "private"},
+    "from": {"id": USER_ID, "is_bot": False, "first_name": "A"}}}
+
+
+def post_updates(bot_tg, requests):
+    """Отправить запросы (заголовки, тело) в вебхук и вернуть коды ответов"""
+    async def run():
+        client = TestClient(TestServer(bot_tg.create_webhook_app()))
+        await client.start_server()
+        try:
+            statuses = []
+            for headers, body in requests:
+                response = await client.post(bot_tg.WEBHOOK_PATH, headers=headers, data=body)
+                statuses.append(response.status)
+            await bot_tg.drain_webhook_tasks()
+            return statuses
+        finally:
+            await client.close()
+
+    return asyncio.run(run())
+
+
+def test_webhook_checks_secret_and_payload(bot_tg, monkeypatch):
+    sent = []
+
+    async def fake_make_request(bot, method, timeout=None):
+        if isinstance(method, SendMessage):
+            sent.append((method.chat_id, method.text))
+        return True
+
+    monkeypatch.setattr(bot_tg.bot.session, "make_request", fake_make_request)
+    monkeypatch.setattr(bot_tg, "WEBHOOK_SECRET", SECRET)
+    body = json.dumps(UPDATE)
+    good = {"X-Telegram-Bot-Api-Secret-Token": SECRET, "Content-Type": "application/json"}
+    wrong = {**good, "X-Telegram-Bot-Api-Secret-Token": "wrong"}
+
+    statuses = post_updates(bot_tg, [(wrong, body), (good, "{not json"), (good, body)])
+
+    assert statuses == [401, 400, 200]
+    # Только последнее обновление дошло до обработчика: незарегистрированный
+    # пользователь получает просьбу зарегистрироваться
+    assert len(sent) == 1
+    chat_id, text = sent[0]
+    assert chat_id == USER_ID
+    assert "зарегистрироваться" in text